@@ -0,0 +1,63 @@
+# app/cache/semantic_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticResponseCache:
+    """In-memory cache that answers near-duplicate questions by embedding similarity"""
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 256, ttl: int = 600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Per query-options bucket: entry id -> (normalized embedding, response, timestamp)
+        self._buckets: Dict[Tuple, "OrderedDict[int, Tuple[np.ndarray, Any, float]]"] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def get(self, embedding: List[float], options: Tuple = ()) -> Optional[Any]:
+        """Return the cached response for the most similar question above threshold"""
+        with self._lock:
+            bucket = self._buckets.get(options)
+            if not bucket:
+                return None
+
+            now = time.time()
+            for entry_id in [i for i, (_, _, ts) in bucket.items() if now - ts > self.ttl]:
+                del bucket[entry_id]
+            if not bucket:
+                return None
+
+            ids = list(bucket)
+            matrix = np.stack([bucket[i][0] for i in ids])
+            sims = matrix @ self._normalize(embedding)
+            best = int(sims.argmax())
+            if sims[best] < self.threshold:
+                return None
+
+            bucket.move_to_end(ids[best])
+            return bucket[ids[best]][1]
+
+    def set(self, embedding: List[float], response: Any, options: Tuple = ()):
+        """Store a response, evicting the least recently used entry when full"""
+        with self._lock:
+            bucket = self._buckets.setdefault(options, OrderedDict())
+            bucket[self._next_id] = (self._normalize(embedding), response, time.time())
+            self._next_id += 1
+            if len(bucket) > self.max_entries:
+                bucket.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached responses"""
+        with self._lock:
+            self._buckets.clear()
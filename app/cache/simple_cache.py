@@ -28,10 +28,10 @@ class SimpleCache:
     
     def _is_expired(self, cache_file: str, ttl: int) -> bool:
         """Check if cache file is expired"""
-        if not os.path.exists(cache_file):
+        try:
+            file_age = time.time() - os.path.getmtime(cache_file)
+        except FileNotFoundError:
             return True
-        
-        file_age = time.time() - os.path.getmtime(cache_file)
         return file_age > ttl
     
     def get(self, key: str, ttl: Optional[int] = None) -> Optional[Any]:
@@ -116,11 +116,22 @@ class SimpleCache:
         cache_key = self._get_cache_key(key)
         cache_file = self._get_cache_file_path(cache_key)
         
-        if os.path.exists(cache_file):
-            try:
-                os.remove(cache_file)
-            except Exception as e:
-                print(f"Error removing cache file {cache_file}: {e}")
+        try:
+            os.remove(cache_file)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error removing cache file {cache_file}: {e}")
+    
+    def _scan_cache_files(self):
+        """Yield (path, stat) for each cache file using a single directory scan"""
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.cache') and entry.is_file():
+                    try:
+                        yield entry.path, entry.stat()
+                    except OSError:
+                        continue
     
     def clear(self):
         """Clear all cache"""
@@ -129,31 +140,27 @@ class SimpleCache:
         
         # Clear file cache
         try:
-            for filename in os.listdir(self.cache_dir):
-                if filename.endswith('.cache'):
-                    os.remove(os.path.join(self.cache_dir, filename))
+            for file_path, _ in self._scan_cache_files():
+                os.remove(file_path)
         except Exception as e:
             print(f"Error clearing cache directory: {e}")
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        cache_files = [f for f in os.listdir(self.cache_dir) if f.endswith('.cache')]
-        
+        file_count = 0
         total_size = 0
         expired_count = 0
+        now = time.time()
         
-        for filename in cache_files:
-            file_path = os.path.join(self.cache_dir, filename)
-            try:
-                total_size += os.path.getsize(file_path)
-                if self._is_expired(file_path, self.default_ttl):
-                    expired_count += 1
-            except:
-                continue
+        for _, st in self._scan_cache_files():
+            file_count += 1
+            total_size += st.st_size
+            if now - st.st_mtime > self.default_ttl:
+                expired_count += 1
         
         return {
             'memory_cache_items': len(self.memory_cache),
-            'file_cache_items': len(cache_files),
+            'file_cache_items': file_count,
             'expired_items': expired_count,
             'total_size_bytes': total_size,
             'total_size_mb': round(total_size / 1024 / 1024, 2)
@@ -162,14 +169,13 @@ class SimpleCache:
     def cleanup_expired(self) -> int:
         """Remove expired cache files"""
         removed_count = 0
+        now = time.time()
         
         try:
-            for filename in os.listdir(self.cache_dir):
-                if filename.endswith('.cache'):
-                    file_path = os.path.join(self.cache_dir, filename)
-                    if self._is_expired(file_path, self.default_ttl):
-                        os.remove(file_path)
-                        removed_count += 1
+            for file_path, st in self._scan_cache_files():
+                if now - st.st_mtime > self.default_ttl:
+                    os.remove(file_path)
+                    removed_count += 1
         except Exception as e:
             print(f"Error cleaning up expired cache: {e}")
         
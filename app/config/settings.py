@@ -1,8 +1,14 @@
 from __future__ import annotations
+import os
+from functools import cached_property
 from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
+# Characters rejected in list items (checked with one set scan per item)
+_JSON_ITEM_FORBIDDEN = frozenset('<>"\'&\n\r')
+_CSV_ITEM_FORBIDDEN = frozenset('<>"\'\n\r')
+
 def _parse_listish(v: Optional[str]) -> List[str]:
     """Securely parse list-like strings, preventing JSON injection attacks"""
     if not v:
@@ -42,7 +48,7 @@ def _parse_listish(v: Optional[str]) -> List[str]:
                     raise ValueError("List item too long")
                 
                 # Basic validation - no dangerous characters
-                if any(char in item_str for char in ['<', '>', '"', "'", '&', '\n', '\r']):
+                if not _JSON_ITEM_FORBIDDEN.isdisjoint(item_str):
                     raise ValueError("Invalid characters in list item")
                 
                 if item_str:
@@ -62,7 +68,7 @@ def _parse_listish(v: Optional[str]) -> List[str]:
             continue  # Skip overly long items
         
         # Basic validation
-        if any(char in item for char in ['<', '>', '"', "'", '\n', '\r']):
+        if not _CSV_ITEM_FORBIDDEN.isdisjoint(item):
             continue  # Skip items with dangerous characters
         
         if item:
@@ -100,6 +106,19 @@ class Settings(BaseSettings):
     # Perfect for RTX 4070 GPU with excellent retrieval performance
     embedding_model: str = Field("mixedbread-ai/mxbai-embed-large-v1", env="EMBEDDING_MODEL")
     openai_embedding_model: str = Field("text-embedding-3-small", env="OPENAI_EMBEDDING_MODEL")
+    # Optional shortened vectors for text-embedding-3-* (e.g. 512); rebuild the index after changing
+    openai_embedding_dimensions: Optional[int] = Field(None, env="OPENAI_EMBEDDING_DIMENSIONS")
+    openai_embedding_concurrency: int = Field(8, env="OPENAI_EMBEDDING_CONCURRENCY")
+    # Persistent cache so unchanged chunks are not re-embedded on every rebuild
+    embedding_cache: bool = Field(True, env="EMBEDDING_CACHE")
+    embedding_cache_path: str = Field("data/cache/embeddings.sqlite", env="EMBEDDING_CACHE_PATH")
+    # Local models: cap padded tokens (longest text x batch size) per packed batch; opt-in for
+    # memory-limited GPUs since it can shrink the tuned embed batch for long texts (0 disables)
+    embedding_token_budget: int = Field(0, env="EMBEDDING_TOKEN_BUDGET")
+
+    # ---------- Query ----------
+    # Reuse answers for questions whose embeddings are at least this similar (0 disables)
+    semantic_cache_threshold: float = Field(0.0, env="SEMANTIC_CACHE_THRESHOLD")
 
     # ---------- IMAP ----------
     imap_host: str = Field(..., env="IMAP_HOST")
@@ -121,13 +140,27 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = "utf-8"
 
-    @property
+    # Parsed once per Settings instance; these are read for every fetched email
+    @cached_property
     def filter_from(self) -> List[str]:
         return _parse_listish(self.filter_from_raw)
 
-    @property
+    @cached_property
     def filter_subject(self) -> List[str]:
         return _parse_listish(self.filter_subject_raw)
 
+_settings_cache: Optional[tuple] = None
+
+def _env_file_mtime() -> Optional[float]:
+    try:
+        return os.stat(".env").st_mtime
+    except OSError:
+        return None
+
 def get_settings() -> Settings:
-    return Settings()
+    """Return shared Settings, re-reading .env only when the file changes"""
+    global _settings_cache
+    mtime = _env_file_mtime()
+    if _settings_cache is None or _settings_cache[0] != mtime:
+        _settings_cache = (mtime, Settings())
+    return _settings_cache[1]
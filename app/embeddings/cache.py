@@ -0,0 +1,224 @@
+# app/embeddings/cache.py
+"""
+Persistent embedding cache - avoids re-embedding the same text across runs
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from pydantic import PrivateAttr
+
+
+class EmbeddingStore:
+    """Two-tier (memory LRU + SQLite) store of text embeddings"""
+
+    def __init__(self, db_path: str = "data/cache/embeddings.sqlite", memory_size: int = 4096):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS emb (k BLOB PRIMARY KEY, vec BLOB NOT NULL)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(namespace: str, text: str) -> bytes:
+        """Hash (namespace, text) into a fixed-size key"""
+        return hashlib.sha256(f"{namespace}\x00{text}".encode("utf-8")).digest()
+
+    def get_many(self, keys: List[bytes]) -> List[Optional[List[float]]]:
+        """Look up keys, returning None for misses"""
+        results: List[Optional[List[float]]] = [None] * len(keys)
+        missing = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vec = self._memory.get(key)
+                if vec is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = vec
+                else:
+                    missing.append(i)
+
+            # SQLite caps bound parameters, so query in slices
+            for start in range(0, len(missing), 500):
+                part = missing[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT k, vec FROM emb WHERE k IN ({placeholders})",
+                    [keys[i] for i in part],
+                ).fetchall()
+                found = {k: v for k, v in rows}
+                for i in part:
+                    blob = found.get(keys[i])
+                    if blob is not None:
+                        vec = array("f", blob).tolist()
+                        self._remember(keys[i], vec)
+                        results[i] = vec
+
+        return results
+
+    def put_many(self, keys: List[bytes], vectors: List[List[float]]):
+        """Store vectors as float32 blobs"""
+        with self._lock:
+            for key, vec in zip(keys, vectors):
+                self._remember(key, vec)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO emb (k, vec) VALUES (?, ?)",
+                [(key, array("f", vec).tobytes()) for key, vec in zip(keys, vectors)],
+            )
+            self._conn.commit()
+
+    def _remember(self, key: bytes, vec: List[float]):
+        """Insert into the memory tier, evicting the least recently used entry"""
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+
+_stores: Dict[str, EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(db_path: str) -> EmbeddingStore:
+    """Return the shared store for db_path so every caller reuses one connection and memory tier"""
+    path = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = EmbeddingStore(path)
+        return store
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Wraps an embedding model and serves repeated texts from EmbeddingStore"""
+
+    _inner: Any = PrivateAttr()
+    _store: Any = PrivateAttr()
+    _namespace: str = PrivateAttr()
+    _token_budget: Optional[int] = PrivateAttr()
+
+    def __init__(self, inner: BaseEmbedding, store: EmbeddingStore, namespace: str,
+                 token_budget: Optional[int] = None, **kwargs: Any):
+        super().__init__(
+            model_name=inner.model_name,
+            embed_batch_size=inner.embed_batch_size,
+            # Batches are fanned out at this level, so inherit the inner concurrency bound
+            num_workers=getattr(inner, "num_workers", None),
+            **kwargs,
+        )
+        self._inner = inner
+        self._store = store
+        self._namespace = namespace
+        self._token_budget = token_budget
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        # Queries may use a model-specific instruction prefix, so never cache them
+        return self._inner.get_query_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return await self._inner.aget_query_embedding(query)
+
+    def get_text_embedding_batch(self, texts: List[str], show_progress: bool = False,
+                                 **kwargs: Any) -> List[List[float]]:
+        """Embed a whole node list at once so lookup, dedup, length sort and packing span every text.
+
+        The base implementation would first cut texts into embed_batch_size chunks, leaving
+        the sort to reorder texts within what is already a single model batch.
+        """
+        results, unique = self._lookup(texts)
+        if unique:
+            pending, order = self._sorted_misses(texts, unique)
+            vectors = []
+            for batch in self._token_batches(pending):
+                # The inner model batches by its embed_batch_size over length-sorted input
+                vectors.extend(self._inner.get_text_embedding_batch(batch, show_progress=show_progress, **kwargs))
+            self._fill(results, unique, self._unsort(vectors, order))
+        return results
+
+    async def aget_text_embedding_batch(self, texts: List[str], show_progress: bool = False,
+                                        **kwargs: Any) -> List[List[float]]:
+        """Async counterpart of get_text_embedding_batch"""
+        results, unique = self._lookup(texts)
+        if unique:
+            # The wrapped model gathers its batches concurrently on the async path
+            pending, order = self._sorted_misses(texts, unique)
+            vectors = []
+            for batch in self._token_batches(pending):
+                vectors.extend(await self._inner.aget_text_embedding_batch(batch, show_progress=show_progress, **kwargs))
+            self._fill(results, unique, self._unsort(vectors, order))
+        return results
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self.get_text_embedding_batch([text])[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self.get_text_embedding_batch(texts)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return (await self.aget_text_embedding_batch([text]))[0]
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await self.aget_text_embedding_batch(texts)
+
+    def _lookup(self, texts: List[str]):
+        """Resolve cached vectors and group misses so each distinct text is embedded once"""
+        keys = [EmbeddingStore.make_key(self._namespace, t) for t in texts]
+        results = self._store.get_many(keys)
+
+        unique = {}
+        for i, vec in enumerate(results):
+            if vec is None:
+                unique.setdefault(keys[i], []).append(i)
+        return results, unique
+
+    @staticmethod
+    def _sorted_misses(texts: List[str], unique) -> tuple:
+        """Order distinct misses by length so each model batch pads to similar sizes"""
+        misses = [texts[p[0]] for p in unique.values()]
+        order = sorted(range(len(misses)), key=lambda i: len(misses[i]))
+        return [misses[i] for i in order], order
+
+    def _token_batches(self, sorted_texts: List[str]) -> List[List[str]]:
+        """Split length-sorted texts so longest-text x batch size stays within the token budget"""
+        if not self._token_budget:
+            return [sorted_texts] if sorted_texts else []
+
+        batches, current = [], []
+        for text in sorted_texts:
+            # ~4 characters per token; texts are ascending, so this one sets the padded length
+            tokens = max(1, len(text) // 4)
+            if current and tokens * (len(current) + 1) > self._token_budget:
+                batches.append(current)
+                current = []
+            current.append(text)
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _unsort(vectors: List[List[float]], order: List[int]) -> List[List[float]]:
+        """Map length-sorted results back to miss order"""
+        restored = [None] * len(order)
+        for vec, i in zip(vectors, order):
+            restored[i] = vec
+        return restored
+
+    def _fill(self, results, unique, vectors):
+        """Persist freshly embedded vectors and fan them out to every position"""
+        self._store.put_many(list(unique), vectors)
+        for positions, vec in zip(unique.values(), vectors):
+            for i in positions:
+                results[i] = vec
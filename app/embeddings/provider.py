@@ -1,6 +1,16 @@
 # app/embeddings/provider.py
 from llama_index.core import Settings
-import torch
+
+# Loaded embedding models keyed by their configuration, reused across calls
+_embed_models = {}
+
+def _with_cache(embed, namespace, settings, token_budget=None):
+    """Wrap an embedding model with the persistent embedding cache if enabled"""
+    if not settings.embedding_cache:
+        return embed
+    from app.embeddings.cache import CachedEmbedding, get_embedding_store
+    return CachedEmbedding(embed, get_embedding_store(settings.embedding_cache_path), namespace,
+                           token_budget=token_budget)
 
 def configure_embeddings(settings=None):
     """Configure embeddings with GPU support if available"""
@@ -10,7 +20,19 @@ def configure_embeddings(settings=None):
     
     provider = (settings.embeddings_provider or 'local_hf').lower()
 
+    # Loading a HuggingFace model (or building a client) is expensive; reuse it
+    model_name = settings.openai_embedding_model if provider == 'openai' else settings.embedding_model
+    key = (provider, model_name, settings.openai_api_key if provider == 'openai' else None,
+           settings.openai_embedding_dimensions if provider == 'openai' else None,
+           settings.embedding_cache, settings.embedding_cache_path, settings.embedding_token_budget)
+    embed = _embed_models.get(key)
+    if embed is not None:
+        Settings.embed_model = embed
+        return embed
+
     if provider == 'local_hf':
+        # torch is only needed for local models; keep it off the OpenAI import path
+        import torch
         from llama_index.embeddings.huggingface import HuggingFaceEmbedding
         
         # Auto-detect GPU
@@ -60,6 +82,10 @@ def configure_embeddings(settings=None):
                 print(f"[ERROR] Failed to load embeddings model: {cpu_error}")
                 raise
         
+        # Local models pad every batch to its longest text, so pack batches by token count
+        embed = _with_cache(embed, f"local_hf:{settings.embedding_model}", settings,
+                            token_budget=settings.embedding_token_budget or None)
+        _embed_models[key] = embed
         Settings.embed_model = embed
         return embed
     
@@ -67,10 +93,20 @@ def configure_embeddings(settings=None):
         from llama_index.embeddings.openai import OpenAIEmbedding
         if not settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY required for OpenAI embeddings")
+        # text-embedding-3-* can return shortened (Matryoshka) vectors
+        dimensions = settings.openai_embedding_dimensions
+        if dimensions and not settings.openai_embedding_model.startswith("text-embedding-3"):
+            print(f"[WARNING] {settings.openai_embedding_model} does not support custom dimensions, ignoring")
+            dimensions = None
         embed = OpenAIEmbedding(
             model=settings.openai_embedding_model,
-            api_key=settings.openai_api_key
+            api_key=settings.openai_api_key,
+            # Bound concurrent batch requests on the async path (rate limits)
+            num_workers=settings.openai_embedding_concurrency,
+            **({"dimensions": dimensions} if dimensions else {})
         )
+        embed = _with_cache(embed, f"openai:{settings.openai_embedding_model}:{dimensions or 'full'}", settings)
+        _embed_models[key] = embed
         Settings.embed_model = embed
         return embed
     
@@ -7,6 +7,7 @@ from typing import List, Dict, Any, Optional, Set
 from pathlib import Path
 from llama_index.core import VectorStoreIndex, StorageContext
 from app.indexing.smart_chunker import SmartEmailChunker
+from app.indexing.index_cache import invalidate_index_cache
 from llama_index.core.schema import TextNode
 import pickle
 
@@ -32,12 +33,13 @@ class IncrementalIndexer:
     
     def _load_metadata(self) -> Dict[str, Any]:
         """Load indexing metadata"""
-        if os.path.exists(self.metadata_file):
-            try:
-                with open(self.metadata_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Warning: Could not load metadata: {e}")
+        try:
+            with open(self.metadata_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: Could not load metadata: {e}")
         
         return {
             "last_update": None,
@@ -55,12 +57,13 @@ class IncrementalIndexer:
     
     def _load_processed_emails(self) -> Set[str]:
         """Load set of processed email IDs"""
-        if os.path.exists(self.processed_emails_file):
-            try:
-                with open(self.processed_emails_file, 'rb') as f:
-                    return pickle.load(f)
-            except Exception as e:
-                print(f"Warning: Could not load processed emails: {e}")
+        try:
+            with open(self.processed_emails_file, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: Could not load processed emails: {e}")
         
         return set()
     
@@ -89,10 +92,11 @@ class IncrementalIndexer:
     
     def _get_source_file_info(self, file_path: str) -> Dict[str, Any]:
         """Get source file information"""
-        if not os.path.exists(file_path):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
             return {}
         
-        stat = os.stat(file_path)
         return {
             'path': file_path,
             'size': stat.st_size,
@@ -155,15 +159,11 @@ class IncrementalIndexer:
     def build_incremental_index(self, raw_path: Optional[str] = None) -> Optional[VectorStoreIndex]:
         """Build index incrementally, only processing new emails"""
         from app.config.settings import get_settings
-        from app.llm.provider import configure_llm
         from app.embeddings.provider import configure_embeddings
         from app.indexing.build_index import _resolve_latest_raw
         from app.ingest.mailparser_adapter import MailParserAdapter
         
-        # Configure LLM and embeddings
         settings = get_settings()
-        configure_llm(settings)
-        configure_embeddings(settings)
         
         # Get raw file path
         try:
@@ -180,15 +180,22 @@ class IncrementalIndexer:
         if not new_emails:
             print("✅ Index is up to date!")
             # Load existing index if available
+            if not os.path.exists(os.path.join(self.persist_dir, "index_store.json")):
+                return None
             try:
-                if os.path.exists(os.path.join(self.persist_dir, "index_store.json")):
-                    from llama_index.core import load_index_from_storage
-                    storage_context = StorageContext.from_defaults(persist_dir=self.persist_dir)
-                    return load_index_from_storage(storage_context)
+                from app.indexing.index_cache import load_persisted_index
+                # The returned index embeds queries, so it needs the model configured
+                configure_embeddings(settings)
+                return load_persisted_index(self.persist_dir)
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 print(f"Warning: Could not load existing index: {e}")
             return None
         
+        # Configure embeddings only now that there is work to do (indexing never calls the LLM)
+        configure_embeddings(settings)
+        
         # Process new emails into nodes using smart chunking
         parser = MailParserAdapter()
         new_nodes: List[TextNode] = []
@@ -284,6 +291,7 @@ class IncrementalIndexer:
         # Save updated index
         os.makedirs(self.persist_dir, exist_ok=True)
         index.storage_context.persist(persist_dir=self.persist_dir)
+        invalidate_index_cache(self.persist_dir)
         
         # Update metadata
         self.metadata.update({
@@ -334,12 +342,13 @@ class IncrementalIndexer:
         }
         
         # Remove existing index files
-        if os.path.exists(self.persist_dir):
-            import shutil
-            try:
-                shutil.rmtree(self.persist_dir)
-            except Exception as e:
-                print(f"Warning: Could not remove old index: {e}")
+        import shutil
+        try:
+            shutil.rmtree(self.persist_dir)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: Could not remove old index: {e}")
         
         # Build fresh index
         return self.build_incremental_index(raw_path)
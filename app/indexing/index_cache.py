@@ -0,0 +1,51 @@
+# app/indexing/index_cache.py
+"""
+Process-wide cache of persisted indexes - loads each index directory once and
+reloads only when the files on disk change
+"""
+
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+# Absolute persist_dir -> (on-disk version, loaded index)
+_indexes: Dict[str, Tuple[Tuple[int, ...], Any]] = {}
+_lock = threading.Lock()
+
+
+def _persisted_version(persist_dir: str) -> Tuple[int, ...]:
+    """Modification times of the files rewritten on every persist"""
+    return tuple(
+        os.stat(os.path.join(persist_dir, name)).st_mtime_ns
+        for name in ("index_store.json", "docstore.json")
+    )
+
+
+def load_persisted_index(persist_dir: str = "data/index"):
+    """Return the index stored in persist_dir, reusing the in-memory copy until it is re-persisted.
+
+    The returned index is shared, so callers that insert nodes should load their own copy.
+    """
+    path = os.path.abspath(persist_dir)
+    version = _persisted_version(path)
+
+    with _lock:
+        cached = _indexes.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+    from llama_index.core import StorageContext, load_index_from_storage
+    index = load_index_from_storage(StorageContext.from_defaults(persist_dir=path))
+
+    with _lock:
+        _indexes[path] = (version, index)
+    return index
+
+
+def invalidate_index_cache(persist_dir: str = None):
+    """Forget cached indexes (all of them when persist_dir is None)"""
+    with _lock:
+        if persist_dir is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(os.path.abspath(persist_dir), None)
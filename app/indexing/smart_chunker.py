@@ -4,11 +4,22 @@ Preserves logical boundaries and conversation context
 """
 
 import re
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 import tiktoken
 
 
+@lru_cache(maxsize=None)
+def _get_tokenizer(encoding_name: str = "cl100k_base"):
+    """Load the tiktoken encoding once per process (None if unavailable)"""
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception:
+        # Fallback to approximate token counting
+        return None
+
+
 @dataclass
 class EmailChunk:
     """Represents a logical chunk of email content"""
@@ -57,11 +68,7 @@ class SmartEmailChunker:
         self.preserve_sentences = preserve_sentences
         
         # Initialize tokenizer (using cl100k_base for GPT-3.5/4)
-        try:
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
-        except:
-            # Fallback to approximate token counting
-            self.tokenizer = None
+        self.tokenizer = _get_tokenizer("cl100k_base")
     
     def chunk_email(self, 
                    email_content: Dict[str, str],
@@ -381,7 +388,8 @@ class SmartEmailChunker:
     def _count_tokens(self, text: str) -> int:
         """Count tokens in text"""
         if self.tokenizer:
-            return len(self.tokenizer.encode(text))
+            # encode_ordinary skips the special-token scan (and never raises on "<|endoftext|>")
+            return len(self.tokenizer.encode_ordinary(text))
         else:
             # Approximate: 1 token ≈ 4 characters
             return len(text) // 4
@@ -8,11 +8,12 @@ from bs4 import BeautifulSoup
 class CleanEmailParser:
     """Clean email parser that extracts only essential text content"""
     
-    def __init__(self):
-        # Regex patterns for cleaning
-        self.email_pattern = re.compile(r'<([^>]+)>')
-        self.whitespace_pattern = re.compile(r'\s+')
-        self.quote_pattern = re.compile(r'^["\']|["\']$')
+    # Regex patterns for cleaning, compiled once for all instances
+    email_pattern = re.compile(r'<([^>]+)>')
+    whitespace_pattern = re.compile(r'\s+')
+    quote_pattern = re.compile(r'^["\']|["\']$')
+    html_tag_pattern = re.compile(r'<[^>]+>')
+    excess_newlines_pattern = re.compile(r'\n{3,}')
         
     def clean_sender(self, sender_field: str) -> str:
         """Extract clean sender name without email formatting"""
@@ -25,19 +26,19 @@ class CleanEmailParser:
         # Extract name part before email address
         if '<' in sender and '>' in sender:
             # Format: "Name" <email@domain.com>
-            name_part = sender.split('<')[0].strip()
+            name_part = sender.partition('<')[0].strip()
             email_part = self.email_pattern.findall(sender)
             
             if name_part:
                 # Remove quotes from name
                 name = self.quote_pattern.sub('', name_part).strip()
-                return name if name else (email_part[0].split('@')[0] if email_part else "Unknown")
+                return name if name else (email_part[0].partition('@')[0] if email_part else "Unknown")
             elif email_part:
                 # Just email, use part before @
-                return email_part[0].split('@')[0]
+                return email_part[0].partition('@')[0]
         elif '@' in sender:
             # Just email address
-            return sender.split('@')[0]
+            return sender.partition('@')[0]
         else:
             # Just name
             return sender
@@ -106,7 +107,7 @@ class CleanEmailParser:
         except Exception as e:
             print(f"Warning: HTML parsing failed, using fallback: {e}")
             # Fallback: remove HTML tags with regex
-            text = re.sub(r'<[^>]+>', '', html_content)
+            text = self.html_tag_pattern.sub('', html_content)
             return self._clean_plain_text(text)
     
     def _clean_plain_text(self, text: str) -> str:
@@ -133,7 +134,7 @@ class CleanEmailParser:
         clean_text = self._remove_signatures(clean_text)
         
         # Remove excessive line breaks
-        clean_text = re.sub(r'\n{3,}', '\n\n', clean_text)
+        clean_text = self.excess_newlines_pattern.sub('\n\n', clean_text)
         
         # Truncate if too long (keep first 5000 chars)
         if len(clean_text) > 5000:
@@ -100,7 +100,14 @@ def fetch_emails(settings, limit=200):
     results = []
     errors = 0
 
-    print(f"Found {len(email_ids)} emails. Fetching last {min(limit, len(email_ids))}...")
+    fetch_total = min(limit, len(email_ids))
+    print(f"Found {len(email_ids)} emails. Fetching last {fetch_total}...")
+
+    # One parser and one set of lowercased filters for the whole fetch
+    from app.ingest.mailparser_adapter import MailParserAdapter
+    parser = MailParserAdapter()
+    filter_from = [f.lower() for f in settings.filter_from]
+    filter_subject = [f.lower() for f in settings.filter_subject]
 
     for i, mail_id in enumerate(reversed(email_ids)):
         if i >= limit:
@@ -159,8 +166,6 @@ def fetch_emails(settings, limit=200):
             email_dict['body'] = body.strip()
             
             # Use MailParserAdapter for parsing
-            from app.ingest.mailparser_adapter import MailParserAdapter
-            parser = MailParserAdapter()
             parsed_email = parser.parse_email_advanced(email_dict)
             
             # Apply filters using parsed data
@@ -168,12 +173,13 @@ def fetch_emails(settings, limit=200):
             sender_email = parsed_email.get('from_email', '')
             subject = parsed_email.get('subject', '')
             
-            if settings.filter_from:
+            if filter_from:
                 sender_combined = f"{sender_name} {sender_email}".lower()
-                if not any(f.lower() in sender_combined for f in settings.filter_from):
+                if not any(f in sender_combined for f in filter_from):
                     continue
-            if settings.filter_subject:
-                if not any(f.lower() in subject.lower() for f in settings.filter_subject):
+            if filter_subject:
+                subject_lower = subject.lower()
+                if not any(f in subject_lower for f in filter_subject):
                     continue
             
             # Create email record using parsed data
@@ -209,7 +215,7 @@ def fetch_emails(settings, limit=200):
             
             # Progress indicator
             if (i + 1) % 50 == 0:
-                print(f"Processed {i + 1}/{min(limit, len(email_ids))} emails...")
+                print(f"Processed {i + 1}/{fetch_total} emails...")
                 
         except Exception as e:
             print(f"Error processing email {mail_id}: {e}")
@@ -12,6 +12,9 @@ Replaces our custom email parsing with the battle-tested mail-parser library:
 """
 
 import mailparser
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 import re
@@ -21,6 +24,17 @@ from email.header import decode_header
 import langdetect
 from langdetect.lang_detect_exception import LangDetectException
 
+# Common English words for the quick language check (built once, not per email)
+ENGLISH_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 
+    'with', 'by', 'this', 'that', 'these', 'those', 'is', 'are', 
+    'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'can',
+    'may', 'might', 'must', 'shall', 'email', 'message', 'dear',
+    'hello', 'hi', 'regards', 'thanks', 'thank', 'you', 'your',
+    'please', 'from', 'subject', 'date', 'sent', 'received'
+})
+
 @dataclass
 class ContentQualityScore:
     """Content quality assessment results"""
@@ -38,42 +52,101 @@ class MailParserAdapter:
     Maintains compatibility with existing quality scoring system
     """
     
+    # Patterns are compiled once at class creation and shared by every instance
+
+    # Marketing content patterns for quality scoring
+    MARKETING_PATTERNS = [
+        r'\[SHOP\s+NOW\]', r'LIMITED\s+TIME', r'EXCLUSIVE\s+OFFER', r'SALE\s+ENDS',
+        r'BUY\s+NOW', r'ORDER\s+TODAY', r'DISCOUNT', r'% OFF', r'FREE\s+SHIPPING',
+        r'CLEARANCE', r'DEALS?', r'PROMO(TION)?', r'SAVE\s+\$', r'SPECIAL\s+OFFER'
+    ]
+    MARKETING_REGEX = re.compile('|'.join(MARKETING_PATTERNS), re.IGNORECASE)
+    
+    # Template content indicators
+    TEMPLATE_PATTERNS = [
+        r'your\s+(job\s+alert|daily\s+digest|weekly\s+summary)',
+        r'new\s+(jobs?\s+match|opportunities|listings)',
+        r'(hi|hello|dear)\s+{{?[^}]+}}?',  # Template variables
+        r'{{[^}]+}}',  # Any template variables
+        r'dear\s+(valued\s+)?(customer|subscriber|member)',
+    ]
+    TEMPLATE_REGEX = re.compile('|'.join(TEMPLATE_PATTERNS), re.IGNORECASE)
+    
+    # Signature/footer patterns
+    SIGNATURE_PATTERNS = [
+        r'unsubscribe', r'privacy\s+policy', r'terms\s+of\s+service',
+        r'you\s+received\s+this\s+email\s+because', r'to\s+stop\s+receiving',
+        r'©\s*20\d{2}', r'all\s+rights\s+reserved', r'confidential'
+    ]
+    SIGNATURE_REGEX = re.compile('|'.join(SIGNATURE_PATTERNS), re.IGNORECASE)
+    
+    # English language indicators
+    ENGLISH_PATTERNS = [
+        r'\b(the|and|or|but|in|on|at|to|for|of|with|by)\b',
+        r'\b(this|that|these|those|here|there|where|when|what|who|how|why)\b',
+        r'\b(is|are|was|were|be|been|being|have|has|had|do|does|did)\b'
+    ]
+    ENGLISH_REGEX = re.compile('|'.join(ENGLISH_PATTERNS), re.IGNORECASE)
+
+    # Email type keywords (plain substrings, matched case-insensitively)
+    JOB_KEYWORDS_REGEX = re.compile('|'.join(map(re.escape, ['job', 'career', 'linkedin'])), re.IGNORECASE)
+    NEWSLETTER_KEYWORDS_REGEX = re.compile('|'.join(map(re.escape, ['newsletter', 'digest', 'update'])), re.IGNORECASE)
+    PROMOTIONAL_KEYWORDS_REGEX = re.compile('|'.join(map(re.escape, ['unsubscribe', 'marketing', 'promotion'])), re.IGNORECASE)
+    REPLY_KEYWORDS_REGEX = re.compile('|'.join(map(re.escape, ['reply', 'response', 're:'])), re.IGNORECASE)
+
+    # Helper patterns for language detection and body cleanup
+    _NON_WORD_RE = re.compile(r'[^\w\s]')
+    _ALPHA_WORD_RE = re.compile(r'\b[a-zA-Z]+\b')
+    _HTML_TAG_RE = re.compile(r'<[^>]+>')
+    _WHITESPACE_RE = re.compile(r'\s+')
+    _BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+    
+    # Parsed results kept per adapter, keyed by a hash of the fields that affect the output
+    PARSE_CACHE_SIZE = 4096
+    
     def __init__(self):
-        # Marketing content patterns for quality scoring
-        self.marketing_patterns = [
-            r'\[SHOP\s+NOW\]', r'LIMITED\s+TIME', r'EXCLUSIVE\s+OFFER', r'SALE\s+ENDS',
-            r'BUY\s+NOW', r'ORDER\s+TODAY', r'DISCOUNT', r'% OFF', r'FREE\s+SHIPPING',
-            r'CLEARANCE', r'DEALS?', r'PROMO(TION)?', r'SAVE\s+\$', r'SPECIAL\s+OFFER'
-        ]
-        self.marketing_regex = re.compile('|'.join(self.marketing_patterns), re.IGNORECASE)
-        
-        # Template content indicators
-        self.template_patterns = [
-            r'your\s+(job\s+alert|daily\s+digest|weekly\s+summary)',
-            r'new\s+(jobs?\s+match|opportunities|listings)',
-            r'(hi|hello|dear)\s+{{?[^}]+}}?',  # Template variables
-            r'{{[^}]+}}',  # Any template variables
-            r'dear\s+(valued\s+)?(customer|subscriber|member)',
-        ]
-        self.template_regex = re.compile('|'.join(self.template_patterns), re.IGNORECASE)
-        
-        # Signature/footer patterns
-        self.signature_patterns = [
-            r'unsubscribe', r'privacy\s+policy', r'terms\s+of\s+service',
-            r'you\s+received\s+this\s+email\s+because', r'to\s+stop\s+receiving',
-            r'©\s*20\d{2}', r'all\s+rights\s+reserved', r'confidential'
-        ]
-        self.signature_regex = re.compile('|'.join(self.signature_patterns), re.IGNORECASE)
-        
-        # English language indicators
-        self.english_patterns = [
-            r'\b(the|and|or|but|in|on|at|to|for|of|with|by)\b',
-            r'\b(this|that|these|those|here|there|where|when|what|who|how|why)\b',
-            r'\b(is|are|was|were|be|been|being|have|has|had|do|does|did)\b'
-        ]
-        self.english_regex = re.compile('|'.join(self.english_patterns), re.IGNORECASE)
+        self._parse_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+    
+    @staticmethod
+    def _parse_cache_key(email_data: Dict[str, Any]) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        for field in ('from', 'subject', 'date', 'body'):
+            digest.update(str(email_data.get(field, '')).encode('utf-8', 'surrogatepass'))
+            digest.update(b'\x00')
+        return digest.digest()
+    
+    def parse_batch(self, emails: List[Dict[str, Any]], max_workers: Optional[int] = None,
+                    chunksize: int = 32) -> List[Dict[str, Any]]:
+        """Parse a list of emails, preserving order (large batches use worker processes)"""
+        parse = self.parse_email_advanced
+        if max_workers == 1 or len(emails) < PARALLEL_PARSE_MIN_EMAILS:
+            return [parse(email_data) for email_data in emails]
+        
+        # Parsing is CPU-bound and holds the GIL, so use processes rather than threads
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_parse_worker) as executor:
+                return list(executor.map(_parse_in_worker, emails, chunksize=chunksize))
+        except Exception as e:
+            print(f"Parallel parsing failed, falling back to serial: {e}")
+            return [parse(email_data) for email_data in emails]
     
     def parse_email_advanced(self, email_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse an email, reusing the result for identical content (templates, re-polled mail)"""
+        key = self._parse_cache_key(email_data)
+        cached = self._parse_cache.get(key)
+        if cached is not None:
+            self._parse_cache.move_to_end(key)
+            return dict(cached)
+        
+        result = self._parse_uncached(email_data)
+        # Parser failures are not cached so a transient error is retried next time
+        if result.get('parsed_by') != 'fallback':
+            self._parse_cache[key] = result
+            if len(self._parse_cache) > self.PARSE_CACHE_SIZE:
+                self._parse_cache.popitem(last=False)
+        return dict(result)
+    
+    def _parse_uncached(self, email_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parse email using mail-parser library with quality assessment
         
@@ -97,7 +170,8 @@ class MailParserAdapter:
             
             # Step 4: Language filtering and quality assessment
             is_english = self._is_english_content(clean_body + " " + clean_subject)
-            language_detected = self._detect_language(clean_body)
+            # langdetect is slow; only run it to name the language of non-English mail
+            language_detected = "en" if is_english else self._detect_language(clean_body)
             
             quality = self._assess_content_quality(clean_body, clean_subject, clean_sender, is_english, language_detected)
             
@@ -199,7 +273,7 @@ class MailParserAdapter:
         
         try:
             # Clean text for language detection
-            clean_text = re.sub(r'[^\w\s]', ' ', text)
+            clean_text = self._NON_WORD_RE.sub(' ', text)
             clean_text = ' '.join(clean_text.split())
             
             if len(clean_text) < 10:
@@ -219,21 +293,11 @@ class MailParserAdapter:
             return False  # Too short to determine
         
         # Quick English word check
-        english_words = {
-            'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 
-            'with', 'by', 'this', 'that', 'these', 'those', 'is', 'are', 
-            'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-            'do', 'does', 'did', 'will', 'would', 'could', 'should', 'can',
-            'may', 'might', 'must', 'shall', 'email', 'message', 'dear',
-            'hello', 'hi', 'regards', 'thanks', 'thank', 'you', 'your',
-            'please', 'from', 'subject', 'date', 'sent', 'received'
-        }
-        
-        words = re.findall(r'\b[a-zA-Z]+\b', text.lower())
+        words = self._ALPHA_WORD_RE.findall(text.lower())
         if len(words) < 5:
             return False
         
-        english_count = sum(1 for word in words if word in english_words)
+        english_count = sum(1 for word in words if word in ENGLISH_WORDS)
         english_ratio = english_count / len(words)
         
         # If quick check passes threshold, it's likely English
@@ -319,15 +383,19 @@ Content-Type: text/html; charset=UTF-8
     def _html_to_text(self, html_content: str) -> str:
         """Convert HTML to clean text"""
         try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.extract()
-            
-            # Get text
-            text = soup.get_text()
+            # Plain text (no tags or entities) needs no HTML parsing
+            if '<' not in html_content and '&' not in html_content:
+                text = html_content
+            else:
+                from bs4 import BeautifulSoup
+                soup = BeautifulSoup(html_content, 'html.parser')
+                
+                # Remove script and style elements
+                for script in soup(["script", "style"]):
+                    script.extract()
+                
+                # Get text
+                text = soup.get_text()
             
             # Break into lines and remove leading/trailing space on each
             lines = (line.strip() for line in text.splitlines())
@@ -341,9 +409,7 @@ Content-Type: text/html; charset=UTF-8
             return text
         except ImportError:
             # Fallback: simple HTML tag removal
-            import re
-            html_tag_pattern = re.compile(r'<[^>]+>')
-            text = html_tag_pattern.sub('', html_content)
+            text = self._HTML_TAG_RE.sub('', html_content)
             return html.unescape(text)
         except Exception:
             return html_content
@@ -363,7 +429,7 @@ Content-Type: text/html; charset=UTF-8
             
             # Detect signature start
             if not in_signature and (
-                self.signature_regex.search(line) or
+                self.SIGNATURE_REGEX.search(line) or
                 line_lower.startswith(('--', '___', '***')) or
                 'unsubscribe' in line_lower
             ):
@@ -375,8 +441,8 @@ Content-Type: text/html; charset=UTF-8
         
         # Rejoin and normalize whitespace
         text = '\n'.join(cleaned_lines)
-        text = re.sub(r'\s+', ' ', text.strip())
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+        text = self._WHITESPACE_RE.sub(' ', text.strip())
+        text = self._BLANK_LINES_RE.sub('\n\n', text)
         
         return text.strip()
     
@@ -443,11 +509,14 @@ Content-Type: text/html; charset=UTF-8
             readability_score = 80.0
         
         # Marketing score
-        marketing_matches = len(self.marketing_regex.findall(body + subject))
+        # Build the scored text and word count once for all metrics below
+        scored_text = body + subject
+        total_words = len(body.split())
+        marketing_matches = len(self.MARKETING_REGEX.findall(scored_text))
         marketing_score = min(100.0, marketing_matches * 15.0)
         
         # Template score
-        template_matches = len(self.template_regex.findall(body + subject))
+        template_matches = len(self.TEMPLATE_REGEX.findall(scored_text))
         template_score = min(100.0, template_matches * 20.0)
         
         # Language confidence (enhanced with detection)
@@ -455,12 +524,11 @@ Content-Type: text/html; charset=UTF-8
             issues.append(f"Non-English content detected ({detected_language})")
             language_confidence = 0.0
         else:
-            english_matches = len(self.english_regex.findall(body))
-            language_confidence = min(100.0, (english_matches / max(1, len(body.split()))) * 100)
+            english_matches = len(self.ENGLISH_REGEX.findall(body))
+            language_confidence = min(100.0, (english_matches / max(1, total_words)) * 100)
         
         # Content ratio (useful content vs noise)
         noise_indicators = marketing_matches + template_matches
-        total_words = len(body.split())
         content_ratio = max(0.0, 1.0 - (noise_indicators / max(1, total_words)))
         
         # Overall score (with English language requirement)
@@ -508,17 +576,16 @@ Content-Type: text/html; charset=UTF-8
     
     def _detect_email_type(self, sender: str, subject: str, body: str) -> str:
         """Detect email type"""
-        sender_lower = sender.lower()
-        subject_lower = subject.lower()
-        body_lower = body.lower()
+        header_text = sender + subject
         
-        if any(word in sender_lower + subject_lower for word in ['job', 'career', 'linkedin']):
+        # One scan per keyword list instead of one substring search per keyword
+        if self.JOB_KEYWORDS_REGEX.search(header_text):
             return 'job_alert'
-        elif any(word in sender_lower + subject_lower for word in ['newsletter', 'digest', 'update']):
+        elif self.NEWSLETTER_KEYWORDS_REGEX.search(header_text):
             return 'newsletter'
-        elif any(word in body_lower for word in ['unsubscribe', 'marketing', 'promotion']):
+        elif self.PROMOTIONAL_KEYWORDS_REGEX.search(body):
             return 'promotional'
-        elif any(word in subject_lower for word in ['reply', 'response', 're:']):
+        elif self.REPLY_KEYWORDS_REGEX.search(subject):
             return 'reply'
         else:
             return 'general'
@@ -552,6 +619,24 @@ Content-Type: text/html; charset=UTF-8
             'was_encoded': False,
         }
 
+# Below this many emails the process pool startup costs more than it saves
+PARALLEL_PARSE_MIN_EMAILS = 200
+
+_worker_parser: Optional[MailParserAdapter] = None
+
+def _init_parse_worker():
+    """Build one adapter per worker process"""
+    global _worker_parser
+    _worker_parser = MailParserAdapter()
+
+def _parse_in_worker(email_data: Dict[str, Any]) -> Dict[str, Any]:
+    return _worker_parser.parse_email_advanced(email_data)
+
+def parse_emails_parallel(emails: List[Dict[str, Any]], max_workers: Optional[int] = None,
+                          chunksize: int = 32) -> List[Dict[str, Any]]:
+    """Parse emails across worker processes, preserving input order"""
+    return MailParserAdapter().parse_batch(emails, max_workers=max_workers, chunksize=chunksize)
+
 def test_mailparser_adapter():
     """Test the mail-parser adapter with encoded content"""
     adapter = MailParserAdapter()
@@ -6,6 +6,17 @@ from dataclasses import dataclass
 from enum import Enum
 import dateparser
 
+# Sentiment lexicons (module-level sets: built once, O(1) membership)
+POSITIVE_WORDS = frozenset({
+    'great', 'excellent', 'wonderful', 'fantastic', 'amazing', 'love',
+    'happy', 'pleased', 'excited', 'congratulations', 'success', 'good'
+})
+
+NEGATIVE_WORDS = frozenset({
+    'urgent', 'problem', 'issue', 'concern', 'worried', 'disappointed',
+    'failed', 'error', 'wrong', 'bad', 'terrible', 'awful', 'hate'
+})
+
 class EmailCategory(Enum):
     """Email categories for auto-classification"""
     URGENT = "urgent"
@@ -155,7 +166,9 @@ class EmailIntelligenceAnalyzer:
             score += 0.5
         
         # Sender importance
-        sender_domain = sender.split('@')[-1] if '@' in sender else ''
+        _, at, sender_domain = sender.rpartition('@')
+        if not at:
+            sender_domain = ''
         if any(domain in sender_domain for domain in self.important_domains):
             score += 1
         
@@ -359,19 +372,9 @@ class EmailIntelligenceAnalyzer:
     
     def _calculate_sentiment(self, text: str) -> float:
         """Simple sentiment analysis (could be enhanced with ML)"""
-        positive_words = [
-            'great', 'excellent', 'wonderful', 'fantastic', 'amazing', 'love',
-            'happy', 'pleased', 'excited', 'congratulations', 'success', 'good'
-        ]
-        
-        negative_words = [
-            'urgent', 'problem', 'issue', 'concern', 'worried', 'disappointed',
-            'failed', 'error', 'wrong', 'bad', 'terrible', 'awful', 'hate'
-        ]
-        
         words = text.lower().split()
-        positive_count = sum(1 for word in words if word in positive_words)
-        negative_count = sum(1 for word in words if word in negative_words)
+        positive_count = sum(1 for word in words if word in POSITIVE_WORDS)
+        negative_count = sum(1 for word in words if word in NEGATIVE_WORDS)
         
         total_words = len(words)
         if total_words == 0:
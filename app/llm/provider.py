@@ -1,6 +1,9 @@
 # app/llm/provider.py
 from llama_index.core import Settings
 
+# Built LLM clients keyed by their configuration, reused across calls
+_llms = {}
+
 def configure_llm(settings=None):
     """Configure global LLM in LlamaIndex Settings and return it."""
     if settings is None:
@@ -9,6 +12,15 @@ def configure_llm(settings=None):
     
     provider = (settings.llm_provider or "ollama").lower()
 
+    if provider == "ollama":
+        key = (provider, settings.ollama_base_url, settings.ollama_model, settings.ollama_num_ctx)
+    else:
+        key = (provider, settings.openai_model, settings.openai_api_key)
+    llm = _llms.get(key)
+    if llm is not None:
+        Settings.llm = llm
+        return llm
+
     if provider == "ollama":
         from llama_index.llms.ollama import Ollama
         llm = Ollama(
@@ -17,6 +29,7 @@ def configure_llm(settings=None):
             request_timeout=180.0,
             additional_kwargs={"num_ctx": settings.ollama_num_ctx},
         )
+        _llms[key] = llm
         Settings.llm = llm
         print(f"[SUCCESS] Configured Ollama with model: {settings.ollama_model}")
         return llm
@@ -27,6 +40,7 @@ def configure_llm(settings=None):
             os.environ["OPENAI_API_KEY"] = settings.openai_api_key
         from llama_index.llms.openai import OpenAI
         llm = OpenAI(model=settings.openai_model)
+        _llms[key] = llm
         Settings.llm = llm
         return llm
 
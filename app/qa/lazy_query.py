@@ -4,15 +4,22 @@ Ultra-fast lazy-loading query engine that defers all heavy imports until needed.
 This should import in <50ms instead of 3500ms.
 """
 from typing import Dict, Any, List, Optional, TYPE_CHECKING
+import re
+import threading
 import time
 from enum import Enum
+from functools import lru_cache
 from app.qa.response_formatter import ResponseFormatter
+from app.security.sanitizer import METADATA_TEXT_TABLE
 
 # Type checking imports (no runtime cost)
 if TYPE_CHECKING:
     from llama_index.core import VectorStoreIndex
     from app.config.settings import Settings
 
+# Pattern used on every query, compiled once (re is already loaded at startup)
+_SENDER_RE = re.compile(r"from\s+([^,\.\?]+)")
+
 class QueryStrategy(Enum):
     """Query strategy options"""
     SIMPLE = "simple"
@@ -36,7 +43,14 @@ class LazyEmailQueryEngine:
         self._embeddings_configured = False
         self._index: Optional["VectorStoreIndex"] = None
         self._hybrid_retriever = None
+        self._query_engines: Dict[tuple, Any] = {}
+        self._hybrid_factory = None
+        self._hybrid_import_tried = False
         self._last_loaded = None
+        self._response_cache = None
+        # Serializes first-use loading between the warm-up thread and queries
+        self._init_lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
         
         # Import states
         self._imports_loaded = False
@@ -47,7 +61,7 @@ class LazyEmailQueryEngine:
             return
         
         print("[LAZY] Loading imports on first use...")
-        start = time.time()
+        start = time.perf_counter()
         
         # Import heavy dependencies only now
         global StorageContext, load_index_from_storage, VectorStoreIndex
@@ -64,7 +78,7 @@ class LazyEmailQueryEngine:
         from app.embeddings.provider import configure_embeddings  
         from app.config.settings import get_settings
         
-        elapsed = time.time() - start
+        elapsed = time.perf_counter() - start
         print(f"[LAZY] Imports loaded in {elapsed*1000:.1f}ms")
         self._imports_loaded = True
     
@@ -79,7 +93,7 @@ class LazyEmailQueryEngine:
         """Lazy load and configure models"""
         if not self._llm_configured or not self._embeddings_configured:
             print("[LAZY] Configuring models on first use...")
-            start = time.time()
+            start = time.perf_counter()
             
             self._ensure_imports()
             settings = self._ensure_settings()
@@ -92,21 +106,23 @@ class LazyEmailQueryEngine:
                 configure_embeddings(settings)
                 self._embeddings_configured = True
             
-            elapsed = time.time() - start
+            elapsed = time.perf_counter() - start
             print(f"[LAZY] Models configured in {elapsed*1000:.1f}ms")
     
     def _ensure_index(self):
         """Lazy load vector index"""
         if self._index is None:
             print("[LAZY] Loading index on first use...")
-            start = time.time()
+            start = time.perf_counter()
             
             self._ensure_imports()
-            storage_context = StorageContext.from_defaults(persist_dir=self.persist_dir)
-            self._index = load_index_from_storage(storage_context)
+            from app.indexing.index_cache import load_persisted_index
+            self._index = load_persisted_index(self.persist_dir)
             self._last_loaded = time.time()
+            # Engines hold retrievers over the previous index
+            self._query_engines.clear()
             
-            elapsed = time.time() - start
+            elapsed = time.perf_counter() - start
             print(f"[LAZY] Index loaded in {elapsed*1000:.1f}ms")
         
         return self._index
@@ -116,11 +132,9 @@ class LazyEmailQueryEngine:
         if not value:
             return "Unknown"
         
-        import re  # Lazy import
-        
         value = str(value).strip()
-        value = re.sub(r'[<>"\'\&@#%\{\}\[\]\\]', '_', value)
-        value = re.sub(r'\s+', ' ', value)
+        value = value.translate(METADATA_TEXT_TABLE)
+        value = ' '.join(value.split())
         
         if len(value) > 200:
             value = value[:197] + "..."
@@ -132,62 +146,109 @@ class LazyEmailQueryEngine:
         if not isinstance(query, str) or not query.strip():
             return None
         
-        import re  # Lazy import
-        
         # Simple regex approach
-        simple_match = re.search(r"from\s+([^,\.\?]+)", query.lower())
+        simple_match = _SENDER_RE.search(query.lower())
         if simple_match:
             return simple_match.group(1).strip()
         
         return None
     
-    def _optimized_query(self, question: str, top_k: int = 5, **kwargs) -> Dict[str, Any]:
-        """Optimized query with lazy loading"""
-        total_start = time.time()
-        
-        # Lazy load everything
-        self._ensure_models()
-        index = self._ensure_index()
-        
-        # Check for sender filtering
-        target_sender = self._extract_sender_from_query(question)
-        actual_top_k = min(top_k * 2, 20) if target_sender else top_k
-        
-        # Create query engine with hybrid search if available
-        if self.use_hybrid:
+    def _get_hybrid_factory(self):
+        """Import the hybrid retriever once, remembering whether it is available"""
+        if not self._hybrid_import_tried:
+            self._hybrid_import_tried = True
             try:
-                # Lazy import hybrid retriever
                 from app.retrieval.hybrid_retriever import create_hybrid_query_engine
-                
+                self._hybrid_factory = create_hybrid_query_engine
+            except Exception as e:
+                # Any import-time failure (missing package, broken plugin) falls back to vector search
+                print(f"[WARNING] Hybrid search unavailable: {e}")
+                print("[WARNING] Falling back to standard vector search")
+        return self._hybrid_factory
+    
+    def _get_query_engine(self, index, response_mode: str, top_k: int, streaming: bool):
+        """Build (or reuse) a query engine; hybrid setup indexes BM25 and loads a reranker"""
+        create_hybrid_query_engine = self._get_hybrid_factory() if self.use_hybrid else None
+        if create_hybrid_query_engine is not None:
+            # The hybrid engine retrieves a fixed candidate set, so only response_mode varies
+            key = ("hybrid", response_mode)
+            query_engine = self._query_engines.get(key)
+            if query_engine is not None:
+                return query_engine
+            try:
                 query_engine = create_hybrid_query_engine(
                     index=index,
                     vector_weight=0.6,
                     bm25_weight=0.4,
                     use_reranker=True,
-                    response_mode=kwargs.get("response_mode", "compact")
+                    response_mode=response_mode
                 )
                 print("[LAZY] Using hybrid search with reranking")
+                self._query_engines[key] = query_engine
+                return query_engine
             except Exception as e:
                 print(f"[WARNING] Could not initialize hybrid search: {e}")
                 print("[WARNING] Falling back to standard vector search")
-                query_engine = index.as_query_engine(
-                    similarity_top_k=actual_top_k,
-                    response_mode=kwargs.get("response_mode", "compact"),
-                    streaming=kwargs.get("streaming", False),
-                    verbose=False
-                )
-        else:
+        
+        key = ("vector", response_mode, top_k, streaming)
+        query_engine = self._query_engines.get(key)
+        if query_engine is None:
             query_engine = index.as_query_engine(
-                similarity_top_k=actual_top_k,
-                response_mode=kwargs.get("response_mode", "compact"),
-                streaming=kwargs.get("streaming", False),
+                similarity_top_k=top_k,
+                response_mode=response_mode,
+                streaming=streaming,
                 verbose=False
             )
+            self._query_engines[key] = query_engine
+        return query_engine
+    
+    def _prepare(self, response_mode: str, top_k: int, streaming: bool):
+        """Load models and index, then return (index, query engine) for this configuration"""
+        with self._init_lock:
+            self._ensure_models()
+            index = self._ensure_index()
+            return index, self._get_query_engine(index, response_mode, top_k, streaming)
+    
+    def warm_up(self) -> threading.Thread:
+        """Start loading models, index and the default query engine in the background"""
+        if self._warmup_thread is None:
+            self._warmup_thread = threading.Thread(target=self._warm, name="lazy-warmup", daemon=True)
+            self._warmup_thread.start()
+        return self._warmup_thread
+    
+    def _warm(self):
+        """Warm-up thread body - errors are left for the first real query to report"""
+        start = time.perf_counter()
+        try:
+            self._prepare("compact", 5, False)
+            print(f"[LAZY] Warm-up finished in {(time.perf_counter() - start)*1000:.1f}ms")
+        except Exception as e:
+            print(f"[LAZY] Warm-up failed: {e}")
+    
+    def _optimized_query(self, question: str, top_k: int = 5,
+                         query_embedding: Optional[List[float]] = None, **kwargs) -> Dict[str, Any]:
+        """Optimized query with lazy loading (query_embedding skips re-embedding the question)"""
+        total_start = time.perf_counter()
+        
+        # Check for sender filtering
+        target_sender = self._extract_sender_from_query(question)
+        actual_top_k = min(top_k * 2, 20) if target_sender else top_k
+        
+        # Lazy load everything (waits for an in-flight warm-up) and reuse the
+        # query engine built for this configuration
+        _, query_engine = self._prepare(
+            response_mode=kwargs.get("response_mode", "compact"),
+            top_k=actual_top_k,
+            streaming=kwargs.get("streaming", False),
+        )
         
         # Execute query
-        query_start = time.time()
-        response = query_engine.query(question)
-        query_time = time.time() - query_start
+        query_start = time.perf_counter()
+        if query_embedding is not None:
+            response = query_engine.query(QueryBundle(query_str=question, embedding=query_embedding))
+        else:
+            response = query_engine.query(question)
+        query_time = time.perf_counter() - query_start
         
         # Get and filter source nodes
         source_nodes = getattr(response, 'source_nodes', [])
@@ -229,7 +290,7 @@ class LazyEmailQueryEngine:
             }
             citations.append(citation)
         
-        total_time = time.time() - total_start
+        total_time = time.perf_counter() - total_start
         
         # Format the response for better readability
         raw_answer = str(response)
@@ -256,11 +317,38 @@ class LazyEmailQueryEngine:
     
     def query(self, question: str, **kwargs) -> Dict[str, Any]:
         """Main query method - always uses optimized approach with lazy loading"""
-        return self._optimized_query(question, **kwargs)
+        settings = self._ensure_settings()
+        if settings.semantic_cache_threshold <= 0:
+            return self._optimized_query(question, **kwargs)
+        
+        # Near-duplicate questions are answered from the semantic cache
+        if self._response_cache is None:
+            from app.cache.semantic_cache import SemanticResponseCache
+            self._response_cache = SemanticResponseCache(threshold=settings.semantic_cache_threshold)
+        
+        # Same lock as warm-up, so a query sent meanwhile waits instead of loading models twice
+        with self._init_lock:
+            self._ensure_models()
+        from llama_index.core import Settings as LlamaSettings
+        embedding = LlamaSettings.embed_model.get_query_embedding(question)
+        # The sender filter changes the results but barely moves the embedding, so key on it too
+        options = tuple(sorted((k, repr(v)) for k, v in kwargs.items())) + (
+            ("sender", self._extract_sender_from_query(question)),)
+        
+        cached = self._response_cache.get(embedding, options)
+        if cached is not None:
+            print("[LAZY] Semantic cache hit")
+            return {**cached, "metadata": {**cached["metadata"], "cache_hit": True}}
+        
+        # Reuse the embedding for retrieval so a cache miss embeds the question only once
+        result = self._optimized_query(question, query_embedding=embedding, **kwargs)
+        self._response_cache.set(embedding, result, options)
+        return result
     
-    @classmethod
-    def clear_cache(cls):
-        """Clear any caches (for compatibility)"""
+    def clear_cache(self):
+        """Clear cached responses"""
+        if self._response_cache is not None:
+            self._response_cache.clear()
         print("[LAZY] Cache cleared")
     
     def get_cache_status(self) -> Dict[str, Any]:
@@ -278,15 +366,14 @@ class LazyEmailQueryEngine:
             "embeddings_configured": self._embeddings_configured,
         }
 
-# Create global instance for singleton behavior
-_global_engine: Optional[LazyEmailQueryEngine] = None
+# Global instance for singleton behavior (every strategy shares the optimized engine)
+@lru_cache(maxsize=1)
+def _global_engine() -> LazyEmailQueryEngine:
+    return LazyEmailQueryEngine(strategy=QueryStrategy.OPTIMIZED)
 
 def get_engine(strategy: str = "optimized") -> LazyEmailQueryEngine:
     """Get or create the global lazy engine instance"""
-    global _global_engine
-    if _global_engine is None:
-        _global_engine = LazyEmailQueryEngine(strategy=QueryStrategy.OPTIMIZED)
-    return _global_engine
+    return _global_engine()
 
 # Convenience functions for backward compatibility  
 def lazy_optimized_ask(question: str, **kwargs) -> Dict[str, Any]:
@@ -294,6 +381,10 @@ def lazy_optimized_ask(question: str, **kwargs) -> Dict[str, Any]:
     engine = get_engine("optimized")
     return engine.query(question, **kwargs)
 
+def warm_up() -> threading.Thread:
+    """Pre-load the global engine in the background so the first query is not cold"""
+    return get_engine().warm_up()
+
 def get_cache_status() -> Dict[str, Any]:
     """Get cache status from global engine"""
     engine = get_engine()
@@ -301,8 +392,7 @@ def get_cache_status() -> Dict[str, Any]:
 
 def clear_cache():
     """Clear cache from global engine"""
-    global _global_engine
-    _global_engine = None
+    _global_engine.cache_clear()
     print("[LAZY] Global engine cleared")
 
 # Aliases for drop-in replacement
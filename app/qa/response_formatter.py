@@ -4,9 +4,23 @@ Enhanced response formatting for ChatGPT/Claude-like summaries
 """
 
 from typing import Dict, Any, List
+from functools import lru_cache
 import re
 
 
+@lru_cache(maxsize=1024)
+def _classify_query(query: str) -> str:
+    """Classify a query by keywords (cached, repeated questions are common)"""
+    query_lower = query.lower()
+    if any(word in query_lower for word in ['summarize', 'summary', 'latest', 'recent', 'news']):
+        return "summary"
+    elif any(word in query_lower for word in ['list', 'what are', 'show me']):
+        return "list"
+    elif any(word in query_lower for word in ['explain', 'how', 'why', 'what is']):
+        return "explanation"
+    return "general"
+
+
 class ResponseFormatter:
     """Format query responses into structured, readable summaries"""
     
@@ -24,11 +38,12 @@ class ResponseFormatter:
             Formatted markdown response
         """
         # Detect query type and format accordingly
-        if any(word in query.lower() for word in ['summarize', 'summary', 'latest', 'recent', 'news']):
+        query_type = _classify_query(query)
+        if query_type == "summary":
             return ResponseFormatter._format_summary_response(raw_response, citations)
-        elif any(word in query.lower() for word in ['list', 'what are', 'show me']):
+        elif query_type == "list":
             return ResponseFormatter._format_list_response(raw_response, citations)
-        elif any(word in query.lower() for word in ['explain', 'how', 'why', 'what is']):
+        elif query_type == "explanation":
             return ResponseFormatter._format_explanation_response(raw_response, citations)
         else:
             return ResponseFormatter._format_general_response(raw_response, citations)
@@ -203,7 +218,7 @@ class ResponseFormatter:
             
             # Clean up sender name
             if '@' in from_name:
-                from_name = from_name.split('<')[0].strip()
+                from_name = from_name.partition('<')[0].strip()
             
             # Truncate long subjects
             if len(subject) > 60:
@@ -11,8 +11,20 @@ from llama_index.core.base_retriever import BaseRetriever
 from llama_index.retrievers.bm25 import BM25Retriever
 from llama_index.core.schema import NodeWithScore, QueryBundle
 from llama_index.core.node_parser import SentenceSplitter
-import torch
-from sentence_transformers import CrossEncoder
+from functools import lru_cache
+
+
+@lru_cache(maxsize=2)
+def _load_cross_encoder(model_name: str):
+    """Load a cross-encoder once and share it between retrievers"""
+    # torch/sentence-transformers take seconds to import; only pay for them when reranking
+    import torch
+    from sentence_transformers import CrossEncoder
+    
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    cross_encoder = CrossEncoder(model_name, max_length=512, device=device)
+    print(f"[HYBRID] Initialized cross-encoder reranker on {device.upper()}")
+    return cross_encoder, device
 
 
 class HybridRetriever(BaseRetriever):
@@ -66,15 +78,10 @@ class HybridRetriever(BaseRetriever):
         
         # Initialize cross-encoder for reranking if enabled
         self.cross_encoder = None
+        self.device = "cpu"
         if use_reranker:
             try:
-                device = "cuda" if torch.cuda.is_available() else "cpu"
-                self.cross_encoder = CrossEncoder(
-                    reranker_model,
-                    max_length=512,
-                    device=device
-                )
-                print(f"[HYBRID] Initialized cross-encoder reranker on {device.upper()}")
+                self.cross_encoder, self.device = _load_cross_encoder(reranker_model)
             except Exception as e:
                 print(f"[WARNING] Could not initialize cross-encoder: {e}")
                 print("[WARNING] Falling back to hybrid search without reranking")
@@ -130,27 +137,15 @@ class HybridRetriever(BaseRetriever):
             for node in bm25_results
         }
         
+        # Index nodes by id (vector results take precedence, as before)
+        nodes_by_id = {n.node.id_: n.node for n in bm25_results}
+        nodes_by_id.update((n.node.id_, n.node) for n in vector_results)
+        
         # Combine scores
-        all_node_ids = set(vector_scores.keys()) | set(bm25_scores.keys())
         combined_nodes = {}
-        
-        for node_id in all_node_ids:
-            # Get the node (from either result set)
-            node = None
-            for n in vector_results:
-                if n.node.id_ == node_id:
-                    node = n.node
-                    break
-            if not node:
-                for n in bm25_results:
-                    if n.node.id_ == node_id:
-                        node = n.node
-                        break
-            
-            if node:
-                # Calculate combined score
-                combined_score = vector_scores.get(node_id, 0) + bm25_scores.get(node_id, 0)
-                combined_nodes[node_id] = NodeWithScore(node=node, score=combined_score)
+        for node_id, node in nodes_by_id.items():
+            combined_score = vector_scores.get(node_id, 0) + bm25_scores.get(node_id, 0)
+            combined_nodes[node_id] = NodeWithScore(node=node, score=combined_score)
         
         # Sort by combined score
         sorted_results = sorted(
@@ -213,7 +208,7 @@ class HybridRetriever(BaseRetriever):
             "bm25_weight": self.bm25_weight,
             "reranking_enabled": self.use_reranker,
             "reranker_model": self.cross_encoder.model_name if self.cross_encoder else None,
-            "device": "cuda" if torch.cuda.is_available() else "cpu"
+            "device": self.device
         }
 
 
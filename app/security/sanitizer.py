@@ -3,6 +3,18 @@ import html
 import re
 from typing import Any, Dict, List, Optional
 
+# Characters that break HTML attributes/markup, and characters that upset markdown rendering
+HTML_BREAKING_CHARS = '<>"\'&'
+MARKUP_PROBLEM_CHARS = '@#%{}[]\\'
+
+# str.translate tables shared by the UI and query engine (one C pass per string)
+DISPLAY_TEXT_TABLE = str.maketrans({
+    **{c: None for c in HTML_BREAKING_CHARS},
+    **{c: '_' for c in MARKUP_PROBLEM_CHARS},
+})
+METADATA_TEXT_TABLE = str.maketrans({c: '_' for c in HTML_BREAKING_CHARS + MARKUP_PROBLEM_CHARS})
+FIELD_INPUT_TABLE = str.maketrans('', '', '<>"\'')
+
 class SecuritySanitizer:
     """Comprehensive security sanitizer for user inputs and outputs"""
     
@@ -70,7 +82,7 @@ class SecuritySanitizer:
         
         # Basic sanitization
         sanitized = field_value.strip()
-        sanitized = re.sub(r'[<>"\']', '', sanitized)  # Remove potentially dangerous chars
+        sanitized = sanitized.translate(FIELD_INPUT_TABLE)  # Remove potentially dangerous chars
         
         return sanitized
     
@@ -123,26 +135,38 @@ class SecuritySanitizer:
     
     def validate_json_structure(self, data: Any, max_depth: int = 10, current_depth: int = 0) -> bool:
         """Validate JSON structure to prevent malicious nested objects"""
-        if current_depth > max_depth:
-            return False
-        
-        if isinstance(data, dict):
-            if len(data) > 100:  # Limit object size
+        # Explicit stack instead of recursion: no per-level call overhead
+        stack = [(data, current_depth)]
+        while stack:
+            node, depth = stack.pop()
+            if depth > max_depth:
                 return False
-            for key, value in data.items():
-                if not isinstance(key, str) or len(key) > 100:
+            
+            if isinstance(node, dict):
+                if len(node) > 100:  # Limit object size
                     return False
-                if not self.validate_json_structure(value, max_depth, current_depth + 1):
+                for key, value in node.items():
+                    if not isinstance(key, str) or len(key) > 100:
+                        return False
+                    if isinstance(value, (dict, list)):
+                        stack.append((value, depth + 1))
+                    elif isinstance(value, str) and len(value) > 10000:
+                        return False
+                    elif depth + 1 > max_depth:
+                        return False
+            elif isinstance(node, list):
+                if len(node) > 1000:  # Limit array size
                     return False
-        elif isinstance(data, list):
-            if len(data) > 1000:  # Limit array size
-                return False
-            for item in data:
-                if not self.validate_json_structure(item, max_depth, current_depth + 1):
+                for item in node:
+                    if isinstance(item, (dict, list)):
+                        stack.append((item, depth + 1))
+                    elif isinstance(item, str) and len(item) > 10000:
+                        return False
+                    elif depth + 1 > max_depth:
+                        return False
+            elif isinstance(node, str):
+                if len(node) > 10000:  # Limit string size
                     return False
-        elif isinstance(data, str):
-            if len(data) > 10000:  # Limit string size
-                return False
         
         return True
 
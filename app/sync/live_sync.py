@@ -18,6 +18,11 @@ import threading
 import queue
 import json
 import os
+import random
+import re
+import select
+import ssl
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass
@@ -26,6 +31,9 @@ import hashlib
 from app.config.settings import get_settings
 from app.ingest.mailparser_adapter import MailParserAdapter
 from app.indexing.build_index import build_index
+from app.indexing.index_cache import invalidate_index_cache
+
+_FETCH_UID_RE = re.compile(rb'UID (\d+)')
 
 @dataclass
 class SyncStatus:
@@ -72,6 +80,7 @@ class LiveEmailSync:
         # Components
         self.parser = MailParserAdapter()
         self.imap_connection = None
+        self._embeddings_configured = False
         self.status = SyncStatus()
         
         # Threading
@@ -88,12 +97,13 @@ class LiveEmailSync:
     
     def _load_sync_state(self) -> Dict[str, Any]:
         """Load persistent sync state"""
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"[SYNC] Error loading state: {e}")
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[SYNC] Error loading state: {e}")
         
         return {
             "last_uid": 0,
@@ -156,76 +166,160 @@ class LiveEmailSync:
         try:
             if hasattr(self.imap_connection, 'capabilities'):
                 capabilities = self.imap_connection.capabilities
-                return b'IDLE' in capabilities
+                # imaplib decodes capabilities to str
+                return 'IDLE' in capabilities
             return False
         except:
             return False
     
+    @staticmethod
+    def _has_buffered_data(conn, sock) -> bool:
+        """True if bytes are already readable without blocking (imaplib's reader buffer or the SSL layer)"""
+        if getattr(sock, 'pending', lambda: 0)():
+            return True
+        # peek() returns the reader's buffer as-is, or tries one raw read; make that read non-blocking
+        previous_timeout = sock.gettimeout()
+        sock.setblocking(False)
+        try:
+            return bool(conn.file.peek(1))
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return False
+        finally:
+            sock.settimeout(previous_timeout)
+    
+    def _idle_wait(self, timeout: int) -> bool:
+        """Block in IMAP IDLE until new mail arrives, the timeout passes, or stop is requested.
+        
+        Returns False if IDLE could not be used, so the caller falls back to polling.
+        """
+        conn = self.imap_connection
+        try:
+            tag = conn._new_tag()
+            conn.send(tag + b' IDLE\r\n')
+            if not conn.readline().startswith(b'+'):
+                return False
+            
+            sock = conn.socket()
+            deadline = time.monotonic() + timeout
+            while not self.stop_event.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Wake every second to honour stop() promptly; an untagged response may already be
+                # buffered (e.g. '* n EXISTS' arriving in the same packet as '+ idling')
+                if (not self._has_buffered_data(conn, sock)
+                        and not select.select([sock], [], [], min(1, remaining))[0]):
+                    continue
+                line = conn.readline()
+                if not line:
+                    raise imaplib.IMAP4.abort("connection closed during IDLE")
+                if b'EXISTS' in line:
+                    break
+            
+            conn.send(b'DONE\r\n')
+            while True:
+                line = conn.readline()
+                if not line:
+                    raise imaplib.IMAP4.abort("connection closed while ending IDLE")
+                if line.startswith(tag):
+                    break
+            return True
+        except Exception as e:
+            print(f"[SYNC] IDLE failed, falling back to polling: {e}")
+            try:
+                conn.logout()
+            except:
+                pass
+            self.imap_connection = None
+            self.status.connection_state = "Disconnected"
+            return False
+    
+    def _ensure_connection(self) -> bool:
+        """Reuse the current IMAP session if it answers NOOP, otherwise reconnect"""
+        if self.imap_connection is not None:
+            try:
+                typ, _ = self.imap_connection.noop()
+                if typ == 'OK':
+                    return True
+            except Exception as e:
+                print(f"[SYNC] Existing connection is stale, reconnecting: {e}")
+        return self.connect()
+    
+    def _fetch_uid_batch(self, batch_ids: List[bytes]):
+        """UID FETCH one batch in a single round trip, reconnecting and retrying once on socket errors"""
+        for attempt in (1, 2):
+            try:
+                return self.imap_connection.uid('fetch', b','.join(batch_ids), '(UID RFC822)')
+            except Exception as e:
+                print(f"[SYNC] Error fetching batch: {e}")
+                if attempt == 2 or not ("socket error" in str(e).lower() or "eof" in str(e).lower()):
+                    break
+                # Try to reconnect on socket errors, then retry the same batch
+                print(f"[SYNC] Socket error detected, attempting reconnection...")
+                if not self.connect():
+                    print(f"[SYNC] Failed to reconnect")
+                    break
+        return 'NO', None
+    
     def fetch_new_emails(self) -> List[Dict[str, Any]]:
         """Fetch only new emails since last sync with batching and reconnection"""
         new_emails = []
         
-        # Always connect fresh for each sync to avoid timeout issues
-        if not self.connect():
+        # Reuse the session opened by start() when it is still alive
+        if not self._ensure_connection():
             return new_emails
         
         try:
-            # Search for new emails
-            if self.sync_state["last_uid"] > 0:
+            # Search by UID so every result can be fetched in bulk and tracked via last_uid
+            last_uid = self.sync_state["last_uid"]
+            if last_uid > 0:
                 # Get emails after last known UID
-                search_criteria = f'UID {self.sync_state["last_uid"]+1}:*'
-                typ, data = self.imap_connection.uid('search', None, search_criteria)
+                search_criteria = f'UID {last_uid+1}:*'
             else:
                 # Get recent emails from last 7 days for initial sync
                 date = (datetime.now() - timedelta(days=7)).strftime("%d-%b-%Y")
-                typ, data = self.imap_connection.search(None, f'(SINCE {date})')
+                search_criteria = f'(SINCE {date})'
+            typ, data = self.imap_connection.uid('search', None, search_criteria)
             
             if typ != 'OK':
                 return new_emails
             
-            email_ids = data[0].split()
+            # "UID n:*" always matches the newest message, even when it is older than n
+            email_ids = [uid for uid in data[0].split() if int(uid) > last_uid]
+            total_ids = len(email_ids)
             
-            print(f"[SYNC] Found {len(email_ids)} potential new emails")
+            print(f"[SYNC] Found {total_ids} potential new emails")
             
-            if len(email_ids) > 100:
+            if total_ids > 100:
                 print(f"[SYNC] Large batch detected, processing in chunks...")
             
-            # Process emails in batches to prevent timeouts
+            # Fetch each batch in a single UID FETCH round trip to prevent timeouts
             batch_size = 50
+            total_batches = (total_ids + batch_size - 1) // batch_size
             processed_count = 0
             
-            for i in range(0, len(email_ids), batch_size):
+            for i in range(0, total_ids, batch_size):
                 batch_ids = email_ids[i:i + batch_size]
-                print(f"[SYNC] Processing batch {i//batch_size + 1}/{(len(email_ids) + batch_size - 1)//batch_size} ({len(batch_ids)} emails)")
+                print(f"[SYNC] Processing batch {i//batch_size + 1}/{total_batches} ({len(batch_ids)} emails)")
                 
-                for email_id in batch_ids:
+                typ, msg_data = self._fetch_uid_batch(batch_ids)
+                if typ != 'OK':
+                    # Later batches would move last_uid past these UIDs, so leave them for the next sync
+                    print(f"[SYNC] Stopping fetch; remaining emails will be retried on next sync")
+                    break
+                
+                for uid, raw_email in self._split_fetch_response(msg_data):
                     try:
-                        # Check connection health every 10 emails
-                        if processed_count % 10 == 0:
-                            try:
-                                self.imap_connection.noop()  # Keep connection alive
-                            except Exception as e:
-                                print(f"[SYNC] Connection check failed, reconnecting: {e}")
-                                if not self.connect():
-                                    print(f"[SYNC] Reconnection failed, stopping fetch")
-                                    break
-                        
-                        # Fetch email with timeout handling
-                        if self.sync_state["last_uid"] > 0:
-                            typ, msg_data = self.imap_connection.uid('fetch', email_id, '(RFC822)')
-                        else:
-                            typ, msg_data = self.imap_connection.fetch(email_id, '(RFC822)')
-                        
-                        if typ != 'OK':
-                            continue
-                        
                         # Parse email
-                        raw_email = msg_data[0][1]
                         msg = email.message_from_bytes(raw_email)
                         
                         # Extract message ID
                         message_id = msg.get('Message-ID', '')
                         
+                        # Update last UID even for duplicates so they are not searched again
+                        if uid is not None and uid > self.sync_state["last_uid"]:
+                            self.sync_state["last_uid"] = uid
+                        
                         # Check if already processed
                         if message_id and message_id in self.sync_state["processed_message_ids"]:
                             continue
@@ -234,8 +328,8 @@ class LiveEmailSync:
                         email_data = self._extract_email_data(msg)
                         
                         # Add UID for tracking
-                        if self.sync_state["last_uid"] > 0:
-                            email_data['uid'] = int(email_id)
+                        if uid is not None:
+                            email_data['uid'] = uid
                         
                         new_emails.append(email_data)
                         processed_count += 1
@@ -247,26 +341,16 @@ class LiveEmailSync:
                             if len(self.sync_state["processed_message_ids"]) > 10000:
                                 self.sync_state["processed_message_ids"] = self.sync_state["processed_message_ids"][-10000:]
                         
-                        # Update last UID
-                        if 'uid' in email_data and email_data['uid'] > self.sync_state["last_uid"]:
-                            self.sync_state["last_uid"] = email_data['uid']
-                        
                         # Progress update for large batches
                         if processed_count % 25 == 0:
-                            print(f"[SYNC] Progress: {processed_count}/{len(email_ids)} emails processed")
+                            print(f"[SYNC] Progress: {processed_count}/{total_ids} emails processed")
                         
                     except Exception as e:
-                        print(f"[SYNC] Error processing email {email_id}: {e}")
-                        # Try to reconnect on socket errors
-                        if "socket error" in str(e).lower() or "eof" in str(e).lower():
-                            print(f"[SYNC] Socket error detected, attempting reconnection...")
-                            if not self.connect():
-                                print(f"[SYNC] Failed to reconnect, stopping batch")
-                                break
+                        print(f"[SYNC] Error processing email {uid}: {e}")
                         continue
                 
                 # Brief pause between batches to prevent overwhelming server
-                if i + batch_size < len(email_ids):
+                if i + batch_size < total_ids:
                     time.sleep(0.5)
             
             print(f"[SYNC] Successfully processed {processed_count} emails")
@@ -286,6 +370,21 @@ class LiveEmailSync:
             
             return new_emails
     
+    @staticmethod
+    def _split_fetch_response(msg_data) -> List[tuple]:
+        """Split a multi-message FETCH response into (uid, raw message bytes) pairs"""
+        messages = []
+        for part in msg_data:
+            if isinstance(part, tuple):
+                match = _FETCH_UID_RE.search(part[0])
+                messages.append([int(match.group(1)) if match else None, part[1]])
+            elif isinstance(part, bytes) and messages and messages[-1][0] is None:
+                # Some servers send the UID item after the message literal
+                match = _FETCH_UID_RE.search(part)
+                if match:
+                    messages[-1][0] = int(match.group(1))
+        return [tuple(m) for m in messages]
+    
     def _extract_email_data(self, msg) -> Dict[str, Any]:
         """Extract email data from message object"""
         # Get body
@@ -325,10 +424,11 @@ class LiveEmailSync:
             "low_quality": []
         }
         
-        for email_data in emails:
-            # Parse with Advanced Parser 2.0
-            parsed = self.parser.parse_email_advanced(email_data)
-            
+        # Parse with Advanced Parser 2.0 in-process: this runs on the sync thread of a multi-threaded
+        # host (Streamlit), where forking a worker pool can deadlock, and it keeps the parse cache warm
+        parsed_emails = self.parser.parse_batch(emails, max_workers=1)
+        
+        for email_data, parsed in zip(emails, parsed_emails):
             # Quality check
             if (parsed['quality_score'] >= self.quality_threshold and 
                 parsed['marketing_score'] <= self.max_marketing_score):
@@ -370,14 +470,12 @@ class LiveEmailSync:
             from llama_index.core import StorageContext, load_index_from_storage, VectorStoreIndex
             from llama_index.core.node_parser import SentenceSplitter
             from llama_index.core.schema import TextNode
-            from app.config.settings import get_settings
-            from app.llm.provider import configure_llm
-            from app.embeddings.provider import configure_embeddings
             
-            # Configure models
-            settings = get_settings()
-            configure_llm(settings)
-            configure_embeddings(settings)
+            # Configure embeddings once per engine (inserting nodes never calls the LLM)
+            if not self._embeddings_configured:
+                from app.embeddings.provider import configure_embeddings
+                configure_embeddings(self.settings)
+                self._embeddings_configured = True
             
             # Load existing index
             storage_context = StorageContext.from_defaults(persist_dir=self.persist_dir)
@@ -437,6 +535,7 @@ class LiveEmailSync:
             
             # Persist updated index
             index.storage_context.persist(persist_dir=self.persist_dir)
+            invalidate_index_cache(self.persist_dir)
             
             print(f"[SYNC] Added {len(new_nodes)} nodes from {len(high_quality_emails)} emails to index")
             
@@ -447,6 +546,7 @@ class LiveEmailSync:
     def _sync_loop(self):
         """Main sync loop - periodic polling with user-friendly intervals"""
         print("[SYNC] Starting periodic sync loop...")
+        consecutive_errors = 0
         
         while not self.stop_event.is_set():
             try:
@@ -487,26 +587,25 @@ class LiveEmailSync:
                     
                     self.status.last_sync = datetime.now()
                     self._update_status(f"✅ Synced {results['accepted']} emails ({results['rejected']} filtered)")
-                    
-                    # Close connection after successful sync to prevent timeout issues
-                    if self.imap_connection:
-                        try:
-                            self.imap_connection.logout()
-                        except:
-                            pass
-                        self.imap_connection = None
-                        self.status.connection_state = "Disconnected"
                 else:
                     self._update_status("📭 No new emails found")
-                    
-                    # Close connection if no new emails to prevent timeouts
-                    if self.imap_connection:
-                        try:
-                            self.imap_connection.logout()
-                        except:
-                            pass
-                        self.imap_connection = None
-                        self.status.connection_state = "Disconnected"
+                
+                consecutive_errors = 0
+                
+                # With IDLE the server pushes new mail, so keep the session and wake on arrival
+                if self.imap_connection and self.check_idle_support():
+                    self._update_status(f"💤 Waiting for new mail (IDLE, up to {self.sync_interval}s)...")
+                    if self._idle_wait(self.sync_interval):
+                        continue
+                
+                # Close connection between polls to prevent timeout issues
+                if self.imap_connection:
+                    try:
+                        self.imap_connection.logout()
+                    except:
+                        pass
+                    self.imap_connection = None
+                    self.status.connection_state = "Disconnected"
                 
                 # Wait before next check (much more reasonable interval)
                 wait_time = self.sync_interval
@@ -529,13 +628,25 @@ class LiveEmailSync:
                     self.imap_connection = None
                     self.status.connection_state = "Error"
                 
-                # Wait before retry with countdown
-                self._update_status("❌ Error occurred, retrying in 30s...")
-                for remaining in range(30, 0, -5):
+                # Back off exponentially (30s doubling up to 5 min) with jitter so
+                # repeated failures don't hammer the server in lockstep
+                consecutive_errors += 1
+                backoff = min(300, 30 * 2 ** (consecutive_errors - 1))
+                retry_in = int(random.uniform(backoff / 2, backoff))
+                self._update_status(f"❌ Error occurred, retrying in {retry_in}s...")
+                for remaining in range(retry_in, 0, -5):
                     if self.stop_event.is_set():
                         break
                     self._update_status(f"❌ Retrying in {remaining}s...")
-                    self.stop_event.wait(5)
+                    self.stop_event.wait(min(5, remaining))
+        
+        # Log out from the owning thread so stop() never has to touch a connection in use
+        if self.imap_connection:
+            try:
+                self.imap_connection.logout()
+            except:
+                pass
+            self.imap_connection = None
     
     def _update_status(self, status: str):
         """Update current status and notify callbacks"""
@@ -579,12 +690,14 @@ class LiveEmailSync:
         # Signal thread to stop
         self.stop_event.set()
         
-        # Wait for thread to finish
+        # Wait for thread to finish (covers an IDLE wake-up plus the DONE round trip)
         if self.sync_thread:
-            self.sync_thread.join(timeout=5)
+            self.sync_thread.join(timeout=15)
         
-        # Close IMAP connection
-        if self.imap_connection:
+        # imaplib is not thread-safe, so only touch the connection once the sync thread is gone
+        if self.sync_thread and self.sync_thread.is_alive():
+            print("[SYNC] Sync thread still busy; it will log out when it exits")
+        elif self.imap_connection:
             try:
                 self.imap_connection.logout()
             except:
@@ -642,11 +755,7 @@ class LiveEmailSync:
         print("[SYNC] Sync state reset - emails will be reprocessed on next sync")
 
 # Global sync instance
-_sync_engine = None
-
+@lru_cache(maxsize=1)
 def get_sync_engine() -> LiveEmailSync:
-    """Get or create global sync engine"""
-    global _sync_engine
-    if _sync_engine is None:
-        _sync_engine = LiveEmailSync()
-    return _sync_engine
\ No newline at end of file
+    """Get or create global sync engine (reset with get_sync_engine.cache_clear())"""
+    return LiveEmailSync()
\ No newline at end of file
@@ -4,33 +4,40 @@ Email Sync Daemon - Phase 3B
 Run this to start live email synchronization in the background
 """
 
-import time
 import signal
 import sys
+import threading
 from datetime import datetime
 
+# Set on shutdown so the stats loop wakes immediately instead of finishing its sleep
+_shutdown = threading.Event()
+
 def signal_handler(sig, frame):
     """Handle shutdown gracefully"""
     print("\n[DAEMON] Shutting down...")
-    sync_engine.stop()
-    sys.exit(0)
+    _shutdown.set()
 
 def on_new_emails(results):
     """Callback when new emails are processed"""
-    print(f"\n[NEW EMAILS] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"  Processed: {results['processed']}")
-    print(f"  Added to index: {results['accepted']}")
-    print(f"  Filtered out: {results['rejected']}")
+    # Build the block first and emit it with one write so sync-thread output cannot interleave
+    lines = [
+        f"\n[NEW EMAILS] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"  Processed: {results['processed']}",
+        f"  Added to index: {results['accepted']}",
+        f"  Filtered out: {results['rejected']}",
+    ]
     
     if results['high_quality']:
-        print(f"  High quality emails:")
+        lines.append("  High quality emails:")
         for email in results['high_quality'][:3]:  # Show first 3
-            print(f"    - {email['clean_subject'][:50]} (from {email['clean_sender']})")
+            lines.append(f"    - {email['clean_subject'][:50]} (from {email['clean_sender']})")
     
     if results['low_quality']:
-        print(f"  Rejected emails:")
+        lines.append("  Rejected emails:")
         for email in results['low_quality'][:3]:  # Show first 3
-            print(f"    - {email['subject'][:50]} ({email['rejection_reason']})")
+            lines.append(f"    - {email['subject'][:50]} ({email['rejection_reason']})")
+    
+    print("\n".join(lines), flush=True)
 
 def on_status_change(status):
     """Callback when sync status changes"""
@@ -67,26 +74,28 @@ def run_daemon():
     
     # Run until interrupted
     try:
-        while True:
-            # Print statistics every 60 seconds
-            time.sleep(60)
-            
+        # Print statistics every 60 seconds
+        while not _shutdown.wait(60):
             stats = sync_engine.get_statistics()
-            print(f"\n[STATS] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"  Status: {stats['current_status']}")
-            print(f"  Connection: {stats['connection_state']}")
-            print(f"  Emails processed: {stats['emails_processed']}")
-            print(f"  Emails added: {stats['emails_added']}")
-            print(f"  Emails filtered: {stats['emails_filtered']}")
-            print(f"  Total synced all-time: {stats['total_synced_all_time']}")
+            lines = [
+                f"\n[STATS] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                f"  Status: {stats['current_status']}",
+                f"  Connection: {stats['connection_state']}",
+                f"  Emails processed: {stats['emails_processed']}",
+                f"  Emails added: {stats['emails_added']}",
+                f"  Emails filtered: {stats['emails_filtered']}",
+                f"  Total synced all-time: {stats['total_synced_all_time']}",
+            ]
             
             if stats['last_sync']:
-                print(f"  Last sync: {stats['last_sync']}")
+                lines.append(f"  Last sync: {stats['last_sync']}")
             
             if stats['errors']:
-                print(f"  Recent errors: {len(stats['errors'])}")
+                lines.append(f"  Recent errors: {len(stats['errors'])}")
                 for error in stats['errors'][-2:]:
-                    print(f"    - {error}")
+                    lines.append(f"    - {error}")
+            
+            print("\n".join(lines), flush=True)
             
     except KeyboardInterrupt:
         pass
@@ -99,5 +108,6 @@ def run_daemon():
 if __name__ == "__main__":
     # Register signal handler for clean shutdown
     signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
     
     sys.exit(run_daemon())
\ No newline at end of file
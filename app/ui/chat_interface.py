@@ -5,9 +5,9 @@ import streamlit as st
 from datetime import datetime
 import time
 import html
-import re
 from app.qa.lazy_query import lazy_optimized_ask
-from app.qa.lazy_query import get_cache_status
+from app.qa.lazy_query import get_cache_status, warm_up
+from app.security.sanitizer import DISPLAY_TEXT_TABLE
 
 def sanitize_html_content(text):
     """Sanitize text content for safe HTML display"""
@@ -18,10 +18,9 @@ def sanitize_html_content(text):
     text = str(text) if text is not None else ""
     
     # Remove or replace problematic characters
-    text = re.sub(r'[<>"\'\&]', '', text)  # Remove HTML-breaking chars
-    text = re.sub(r'[@#%\{\}\[\]\\]', '_', text)  # Replace problematic chars
-    text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-    text = text.strip()
+    # Drop HTML-breaking chars, replace problematic ones
+    text = text.translate(DISPLAY_TEXT_TABLE)
+    text = ' '.join(text.split())  # Normalize whitespace
     
     # Limit length to prevent UI issues
     if len(text) > 500:
@@ -37,6 +36,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Load models and index in the background while the page renders (no-op on reruns)
+warm_up()
+
 # Custom CSS for chat interface
 st.markdown("""
 <style>
@@ -260,9 +262,9 @@ if st.session_state.processing:
         last_user_msg = st.session_state.messages[-1]["content"]
         
         # Get response using enhanced ingest pipeline
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = lazy_optimized_ask(last_user_msg, top_k=5, include_sources=False)  # Sources shown separately
-        response_time = time.time() - start_time
+        response_time = time.perf_counter() - start_time
         
         # Add assistant response
         assistant_msg = {